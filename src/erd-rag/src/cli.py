@@ -5,20 +5,34 @@ from embedder import Embedder
 from indexer import VectorIndexer
 from retriever import Retriever
 from config import Config
-from utils import load_text
+from utils import save_json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
-def build_index(erd_path: str):
-    md = load_text(erd_path)
-    tables = parse_markdown_erd(md)
-    # create docs
+# below this many tables, worker start-up costs more than the doc construction itself
+PARALLEL_MIN_TABLES = 200
+
+def make_docs(tables: dict) -> list:
+    if len(tables) >= PARALLEL_MIN_TABLES:
+        # make_table_doc is pure-Python CPU work, so use processes rather than GIL-bound threads
+        workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            enriched_list = list(ex.map(make_table_doc, tables.values(), chunksize=max(1, len(tables) // (4 * workers))))
+    else:
+        enriched_list = [make_table_doc(t) for t in tables.values()]
     docs = []
-    for tname, t in tables.items():
-        enriched = make_table_doc(t)
+    for enriched in enriched_list:
         docs.append(enriched["table_doc"])
         docs.extend(enriched["col_docs"])
         docs.extend(enriched["rel_docs"])
+    return docs
+
+def build_index(erd_path: str):
+    with open(erd_path, "r", encoding="utf8") as f:
+        tables = parse_markdown_erd(f)
+    # create docs
+    docs = make_docs(tables)
 
     # build embedding + vector store
     emb = Embedder()
@@ -27,7 +41,9 @@ def build_index(erd_path: str):
     texts = [d["text"] for d in docs]
     metas = [d["meta"] for d in docs]
     print(f"Upserting {len(ids)} docs to vector store...")
-    indexer.upsert(ids, texts, metas)
+    vectors = indexer.upsert(ids, texts, metas)
+    indexer.persist()
+    indexer.build_dense(ids, vectors)
 
     # build sparse and graph for retriever
     retr = Retriever(emb, indexer)
@@ -36,35 +52,21 @@ def build_index(erd_path: str):
     # read relations from parsed tables
     tables_list = list(tables.keys())
     retr.ingest_graph(tables_list)
-    for t in tables.values():
-        for r in t.get("relations", []):
-            retr.graph.add_relation(t["name"], r["to_table"])
+    retr.graph.add_relations([(t["name"], r["to_table"]) for t in tables.values() for r in t.get("relations", [])])
+    retr.save(Config.CHROMA_DIR)
 
     # persist a minimal metadata file
-    import json
-    with open(os.path.join(Config.CHROMA_DIR, "meta_tables.json"), "w") as f:
-        json.dump({"tables": tables_list}, f, indent=2)
+    save_json(os.path.join(Config.CHROMA_DIR, "meta_tables.json"), {"tables": tables_list})
     print("Index built and metadata persisted.")
 
 def query_index(q: str):
     emb = Embedder()
     indexer = VectorIndexer(emb)
     retr = Retriever(emb, indexer)
-    # load sparse from chroma collection documents (for simplicity read all docs)
-    col = indexer.collection
-    all_data = col.get(include=["ids","documents","metadatas"])
-    docs = []
-    for i, did in enumerate(all_data["ids"]):
-        docs.append({"id": did, "text": all_data["documents"][i], "meta": all_data["metadatas"][i]})
-    retr.ingest_docs_for_sparse(docs)
-    # graph: reconstruct small graph from meta if present
-    try:
-        import json, os
-        with open(os.path.join(Config.CHROMA_DIR, "meta_tables.json")) as f:
-            meta = json.load(f)
-            retr.ingest_graph(meta.get("tables", []))
-    except Exception:
-        pass
+    # sparse index + graph come from the files written by build; the corpus itself is never fetched
+    if not retr.load_persisted(Config.CHROMA_DIR):
+        print(f"No persisted index found in {Config.CHROMA_DIR}; run `build --erd <file>` first.")
+        return
 
     results = retr.hybrid_query(q, top_k=Config.TOP_K)
     from rag import build_rag_prompt
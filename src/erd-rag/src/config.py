@@ -7,3 +7,4 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
     CHROMA_DIR = os.getenv("CHROMA_DIR", "./.chroma")
     TOP_K = int(os.getenv("TOP_K", "10"))
+    DENSE_QUANT = os.getenv("DENSE_QUANT", "int8")  # int8 | fp16 | fp32
@@ -1,4 +1,5 @@
-from typing import List, Iterable
+import asyncio
+from typing import Dict, Iterable, List, Tuple
 import numpy as np
 from config import Config
 
@@ -8,13 +9,26 @@ from sentence_transformers import SentenceTransformer
 import openai
 
 EMBED_DIM_LOCAL = 384
+LOCAL_MODEL = "all-MiniLM-L6-v2"
+LOCAL_BATCH = 64
+OPENAI_MODEL = "text-embedding-3-large"
+OPENAI_BATCH = 512  # API accepts up to 2048 inputs per request
+OPENAI_CONCURRENCY = 5
+
+# loaded models are shared across Embedder instances within a process
+_MODEL_CACHE: Dict[str, SentenceTransformer] = {}
+
+def _load_model(name: str) -> SentenceTransformer:
+    if name not in _MODEL_CACHE:
+        _MODEL_CACHE[name] = SentenceTransformer(name)
+    return _MODEL_CACHE[name]
 
 class Embedder:
     def __init__(self):
         self.mode = Config.EMBEDDER.lower()
         if self.mode == "local":
             # choose a compact embedding model
-            self.model = SentenceTransformer("all-MiniLM-L6-v2")
+            self.model = _load_model(LOCAL_MODEL)
             self.dim = self.model.get_sentence_embedding_dimension()
         elif self.mode == "openai":
             if not Config.OPENAI_API_KEY:
@@ -24,18 +38,49 @@ class Embedder:
         else:
             raise ValueError("Unknown EMBEDDER mode")
 
-    def embed(self, texts: Iterable[str]) -> List[List[float]]:
+    def warm(self, texts: Iterable[str] = ("warmup",)):
+        """
+        Run a throwaway encode so lazy torch init happens before the first real query.
+        """
+        if self.mode == "local":
+            self.embed(texts)
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Return a (N, dim) float32 matrix; chroma accepts it as-is, so no list-of-lists copy.
+        """
         texts = list(texts)
         if self.mode == "local":
-            arr = self.model.encode(texts, normalize_embeddings=True)
-            return arr.tolist()
+            if not texts:
+                return np.empty((0, self.dim), dtype=np.float32)
+            # encode shortest-first so each minibatch pads to similar lengths, then scatter back
+            order = np.argsort([len(t) for t in texts], kind="stable")
+            arr = self.model.encode([texts[i] for i in order], batch_size=LOCAL_BATCH,
+                                    convert_to_numpy=True, normalize_embeddings=True)
+            inv = np.empty_like(order)
+            inv[order] = np.arange(len(order))
+            return np.ascontiguousarray(arr[inv], dtype=np.float32)
         else:
-            # OpenAI batching
-            out = []
-            B = 20
-            for i in range(0, len(texts), B):
-                batch = texts[i:i+B]
-                resp = openai.Embedding.create(model="text-embedding-3-large", input=batch)
-                out.extend([d["embedding"] for d in resp["data"]])
-            # normalize optionally
-            return out
+            return asyncio.run(self._embed_openai_async(texts))
+
+    async def _embed_openai_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Fire OpenAI batches concurrently (bounded by OPENAI_CONCURRENCY) and merge them in input order.
+        """
+        sem = asyncio.Semaphore(OPENAI_CONCURRENCY)
+
+        async def _call(offset: int, batch: List[str]) -> Tuple[int, List[List[float]]]:
+            async with sem:
+                resp = await openai.Embedding.acreate(model=OPENAI_MODEL, input=batch)
+            return offset, [d["embedding"] for d in resp["data"]]
+
+        results = await asyncio.gather(*[
+            _call(i, texts[i:i+OPENAI_BATCH]) for i in range(0, len(texts), OPENAI_BATCH)
+        ])
+        if not results:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        self.dim = len(results[0][1][0])
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for offset, vectors in results:
+            out[offset:offset+len(vectors)] = vectors
+        return out
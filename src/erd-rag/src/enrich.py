@@ -1,19 +1,25 @@
 import re
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
 ABBR = {"cust": "customer", "addr": "address", "amt": "amount", "qty": "quantity", "dt": "date", "usr": "user", "prod": "product"}
 
-def split_identifier(name: str) -> List[str]:
+RE_IDENT = re.compile(r"[A-Z]?[a-z]+|[0-9]+")
+
+# column names like id / created_at repeat across tables, so identifier work is memoised
+@lru_cache(maxsize=4096)
+def split_identifier(name: str) -> Tuple[str, ...]:
     name = name.replace("_"," ")
     # split camelCase as well
-    parts = re.findall(r"[A-Z]?[a-z]+|[0-9]+", name)
+    parts = RE_IDENT.findall(name)
     if not parts:
         parts = [name]
-    return [p.lower() for p in parts]
+    return tuple(p.lower() for p in parts)
 
 def expand_parts(parts):
     return [ABBR.get(p, p) for p in parts]
 
+@lru_cache(maxsize=4096)
 def canonicalize(name: str) -> str:
     parts = split_identifier(name)
     parts = expand_parts(parts)
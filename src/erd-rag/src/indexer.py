@@ -1,9 +1,27 @@
 from chromadb.utils import embedding_functions
 import chromadb
 from chromadb.config import Settings
+import faiss
+import numpy as np
 import os
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from config import Config
+from utils import save_json, load_json
+
+UPSERT_BATCH = 5000
+DENSE_FILE = "dense.faiss"
+DENSE_IDS_FILE = "dense_ids.json"
+
+def _make_dense_index(dim: int):
+    # scalar-quantized storage cuts the bytes scanned per query 4x (int8) / 2x (fp16) vs fp32
+    quant = Config.DENSE_QUANT.lower()
+    if quant == "fp32":
+        return faiss.IndexFlatIP(dim)
+    if quant == "int8":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    if quant == "fp16":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    raise ValueError("Unknown DENSE_QUANT mode")
 
 class VectorIndexer:
     def __init__(self, embedder):
@@ -13,20 +31,65 @@ class VectorIndexer:
         # choose embedding function wrapper only for chroma when using local sbert we will pass raw vectors
         self.collection = self.client.get_or_create_collection(name="erd_docs")
         self.embedder = embedder
+        self.persist_dir = persist
+        self.dense = None
+        self.dense_ids: List[str] = []
 
     def upsert(self, ids: List[str], texts: List[str], metadatas: List[Dict]):
-        if Config.EMBEDDER == "local":
-            # Chroma can accept embeddings directly; but to keep simple, we'll store vectors in the collection via embeddings param
-            vectors = self.embedder.embed(texts)
-            self.collection.add(ids=ids, documents=texts, metadatas=metadatas, embeddings=vectors)
-        else:
-            # openai or remote: store text only and let chroma call embedding function? We'll embed first then store
-            vectors = self.embedder.embed(texts)
-            self.collection.add(ids=ids, documents=texts, metadatas=metadatas, embeddings=vectors)
+        # embed first (local sbert or openai), then store vectors alongside the docs
+        vectors = self.embedder.embed(texts)
+        for i in range(0, len(ids), UPSERT_BATCH):
+            j = i + UPSERT_BATCH
+            # chroma validates embeddings as plain lists; the float32 matrix is kept for faiss
+            self.collection.upsert(ids=ids[i:j], documents=texts[i:j], metadatas=metadatas[i:j], embeddings=vectors[i:j].tolist())
+        return vectors
+
+    def build_dense(self, ids: List[str], vectors: np.ndarray):
+        """
+        Flat inner-product index over unit vectors (scores are cosine similarities), written next to chroma.
+        """
+        vectors = np.array(vectors, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        self.dense = _make_dense_index(vectors.shape[1])
+        if not self.dense.is_trained:
+            # int8 learns per-dimension value ranges from the corpus
+            self.dense.train(vectors)
+        self.dense.add(vectors)
+        self.dense_ids = list(ids)
+        faiss.write_index(self.dense, os.path.join(self.persist_dir, DENSE_FILE))
+        save_json(os.path.join(self.persist_dir, DENSE_IDS_FILE), self.dense_ids)
+
+    def load_dense(self) -> bool:
+        if self.dense is not None:
+            return True
+        path = os.path.join(self.persist_dir, DENSE_FILE)
+        if not os.path.exists(path):
+            return False
+        self.dense = faiss.read_index(path)
+        self.dense_ids = load_json(os.path.join(self.persist_dir, DENSE_IDS_FILE))
+        return True
+
+    def search_dense(self, vector, k=10) -> List[Tuple[str, float]]:
+        """
+        Return (id, cosine) pairs; uses the faiss index when built, otherwise chroma.
+        """
+        if not self.load_dense():
+            res = self.query_vectors(vector, n_results=k)
+            # chroma reports squared L2; for unit vectors cos = 1 - d/2
+            return [(did, 1.0 - d / 2.0) for did, d in zip(res["ids"][0], res["distances"][0])]
+        q = np.array(vector, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(q)
+        D, I = self.dense.search(q, k)
+        return [(self.dense_ids[i], float(d)) for d, i in zip(D[0], I[0]) if i >= 0]
+
+    def persist(self):
+        # older chroma clients buffer writes until persist(); newer ones write through
+        if hasattr(self.client, "persist"):
+            self.client.persist()
 
     def query_vectors(self, vector, n_results=10):
         # query by embedding
-        res = self.collection.query(query_embeddings=[vector], n_results=n_results, include=["metadatas","distances","documents","ids"])
+        res = self.collection.query(query_embeddings=[np.asarray(vector, dtype=np.float32).tolist()], n_results=n_results, include=["metadatas","distances","documents","ids"])
         return res
 
     def query_text(self, text, n_results=10):
@@ -1,39 +1,51 @@
+import io
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Union
 
-def parse_markdown_erd(md_text: str) -> Dict[str, Any]:
+RE_TABLE = re.compile(r"^###[ \t]*Table[ \t]*:[ \t]*(\S+)", re.I)
+RE_COL = re.compile(r"^[ \t]*-[ \t]*`?([\w_]+)`?[ \t]*(\([^)\n]+\))?[ \t]*-[ \t]*(.*)")
+RE_FK = re.compile(r"FK\s*->\s*([A-Za-z0-9_]+)\.([A-Za-z0-9_]+)")
+RE_DESC = re.compile(r"^[ \t]*Description[ \t]*:[ \t]*(.*)", re.I)
+
+def parse_markdown_erd(lines: Union[str, Iterable[str]]) -> Dict[str, Any]:
     """
     Parses a markdown ERD with sections like:
     ### Table: orders
     Description: ...
     - `order_id` (INT) - primary key
     - `cust_id` (INT) - FK -> customers.id
+
+    Accepts the markdown text or any iterable of lines (e.g. an open file), which is consumed
+    one line at a time.
     """
+    if isinstance(lines, str):
+        lines = io.StringIO(lines)
     tables = {}
     cur = None
-    for line in md_text.splitlines():
+    for line in lines:
         line = line.rstrip()
-        m_table = re.match(r"^###\s*Table\s*:\s*(\S+)", line, re.I)
+        m_table = RE_TABLE.match(line)
         if m_table:
             cur = m_table.group(1).strip()
             tables[cur] = {"name": cur, "description": "", "columns": [], "relations": []}
             continue
         if cur is None:
             continue
-        m_col = re.match(r"^\s*-\s*`?([\w_]+)`?\s*(\([^)]+\))?\s*-\s*(.*)", line)
+        m_col = RE_COL.match(line)
         if m_col:
             col, typ, desc = m_col.groups()
+            desc = desc.strip()
             tables[cur]["columns"].append({
                 "name": col,
                 "type": typ.strip("()") if typ else None,
-                "desc": desc.strip()
+                "desc": desc
             })
             # detect FK relations in desc
-            fk = re.search(r"FK\s*->\s*([A-Za-z0-9_]+)\.([A-Za-z0-9_]+)", desc)
+            fk = RE_FK.search(desc)
             if fk:
                 tables[cur]["relations"].append({"from_col": col, "to_table": fk.group(1), "to_col": fk.group(2)})
             continue
-        m_desc = re.match(r"^\s*Description\s*:\s*(.*)", line, re.I)
+        m_desc = RE_DESC.match(line)
         if m_desc:
             tables[cur]["description"] += (" " + m_desc.group(1).strip())
     return tables
@@ -1,30 +1,92 @@
-from typing import List, Dict, Any, Tuple
-from rank_bm25 import BM25Okapi
+import os
+import pickle
+import re
+from typing import Iterable, List, Dict, Any, Tuple
+from collections import Counter, defaultdict
+from functools import lru_cache
+from heapq import nlargest
 import networkx as nx
+from scipy import sparse
 from tqdm import tqdm
 from config import Config
 import numpy as np
 
+TOKEN_RE = re.compile(r"\w+")
+SPARSE_FILE = "sparse.pkl"
+GRAPH_FILE = "graph.gpkl"
+
 class SparseIndex:
-    def __init__(self):
+    """
+    BM25 over a precomputed (docs x vocab) CSR matrix: a query is one sparse matvec plus top-k selection.
+    """
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
         self.corpus = []
         self.ids = []
-        self.bm25 = None
+        self.vocab: Dict[str, int] = {}
+        self.idf = None
+        self.avgdl = 0.0
+        self.matrix = None
 
     def add(self, text: str, id: str):
-        tokens = text.lower().split()
+        tokens = TOKEN_RE.findall(text.lower())
         self.corpus.append(tokens)
         self.ids.append(id)
 
+    def add_many(self, texts: Iterable[str], ids: Iterable[str]):
+        self.corpus.extend(TOKEN_RE.findall(t.lower()) for t in texts)
+        self.ids.extend(ids)
+
     def build(self):
-        self.bm25 = BM25Okapi(self.corpus)
+        self.vocab = {}
+        rows, cols, tfs = [], [], []
+        for r, tokens in enumerate(self.corpus):
+            for tok, tf in Counter(tokens).items():
+                rows.append(r)
+                cols.append(self.vocab.setdefault(tok, len(self.vocab)))
+                tfs.append(tf)
+        n_docs = len(self.corpus)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        tf = np.asarray(tfs, dtype=np.float32)
+        dl = np.asarray([len(t) for t in self.corpus], dtype=np.float32)
+        self.avgdl = float(dl.mean()) if n_docs else 0.0
+        # idf with the +1 smoothing (always positive, unlike raw Okapi idf on common terms)
+        df = np.bincount(cols, minlength=len(self.vocab)).astype(np.float32)
+        self.idf = np.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+        norm = self.k1 * (1 - self.b + self.b * dl[rows] / max(self.avgdl, 1e-9))
+        weights = self.idf[cols] * (tf * (self.k1 + 1)) / (tf + norm)
+        self.matrix = sparse.csr_matrix((weights, (rows, cols)), shape=(n_docs, len(self.vocab)), dtype=np.float32)
+
+    def save(self, path: str):
+        state = {"matrix": self.matrix, "vocab": self.vocab, "idf": self.idf, "ids": self.ids,
+                 "avgdl": self.avgdl, "k1": self.k1, "b": self.b}
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=5)
+
+    @classmethod
+    def load(cls, path: str) -> "SparseIndex":
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        idx = cls(k1=state["k1"], b=state["b"])
+        idx.matrix, idx.vocab, idx.idf = state["matrix"], state["vocab"], state["idf"]
+        idx.ids, idx.avgdl = state["ids"], state["avgdl"]
+        return idx
 
     def query(self, q: str, topk=10) -> List[Tuple[str,float]]:
-        if self.bm25 is None:
+        if self.matrix is None or not self.ids:
             return []
-        tokens = q.lower().split()
-        scores = self.bm25.get_scores(tokens)
-        idx = np.argsort(-scores)[:topk]
+        tokens = TOKEN_RE.findall(q.lower())
+        cols = [self.vocab[t] for t in tokens if t in self.vocab]
+        if not cols:
+            return []
+        # repeated query terms count repeatedly, as in Okapi BM25
+        qvec = np.bincount(cols, minlength=len(self.vocab)).astype(np.float32)
+        scores = self.matrix @ qvec
+        k = min(topk, len(scores))
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
         results = [(self.ids[i], float(scores[i])) for i in idx if scores[i] > 0]
         return results
 
@@ -38,11 +100,16 @@ class GraphHelper:
     def add_relation(self, from_table, to_table):
         self.G.add_edge(from_table, to_table)
 
+    def add_relations(self, pairs: List[Tuple[str, str]]):
+        self.G.add_edges_from(pairs)
+
     def one_hop_neighbors(self, table_names: List[str]) -> List[str]:
+        pred, succ = self.G.pred, self.G.succ
         out = set()
         for t in table_names:
-            out.update(self.G.predecessors(t))
-            out.update(self.G.successors(t))
+            out |= pred.get(t, {}).keys()
+            out |= succ.get(t, {}).keys()
+        out.difference_update(table_names)
         return list(out)
 
 class Retriever:
@@ -51,11 +118,16 @@ class Retriever:
         self.indexer = indexer
         self.sparse = SparseIndex()
         self.graph = GraphHelper()
+        # repeated queries (auto-complete, reranking) skip the transformer forward pass
+        self._embed_query = lru_cache(maxsize=256)(self._embed_query_uncached)
+
+    def _embed_query_uncached(self, query: str) -> np.ndarray:
+        vec = self.embedder.embed([query])[0]
+        vec.flags.writeable = False  # shared between cache hits
+        return vec
 
     def ingest_docs_for_sparse(self, docs: List[Dict]):
-        for d in docs:
-            # use id and text
-            self.sparse.add(d["id"], d["text"])
+        self.sparse.add_many((d["text"] for d in docs), (d["id"] for d in docs))
         self.sparse.build()
 
     def ingest_graph(self, tables):
@@ -63,38 +135,51 @@ class Retriever:
             self.graph.add_table(t)
         # edges parsed from metadata in chroma later when building
 
+    def save(self, persist_dir: str):
+        """
+        Persist the built sparse index and table graph so queries can skip re-ingesting the corpus.
+        """
+        self.sparse.save(os.path.join(persist_dir, SPARSE_FILE))
+        with open(os.path.join(persist_dir, GRAPH_FILE), "wb") as f:
+            pickle.dump(self.graph.G, f, protocol=5)
+
+    def load_persisted(self, persist_dir: str) -> bool:
+        """
+        Load state written by save(); returns False when either file is missing.
+        """
+        sparse_path = os.path.join(persist_dir, SPARSE_FILE)
+        graph_path = os.path.join(persist_dir, GRAPH_FILE)
+        if not (os.path.exists(sparse_path) and os.path.exists(graph_path)):
+            return False
+        self.sparse = SparseIndex.load(sparse_path)
+        with open(graph_path, "rb") as f:
+            self.graph.G = pickle.load(f)
+        return True
+
     def hybrid_query(self, query: str, top_k:int=Config.TOP_K) -> List[Dict]:
         # dense:
-        q_vec = self.embedder.embed([query])[0]
-        dense_res = self.indexer.query_vectors(q_vec, n_results=top_k)
-        dense_ids = dense_res["ids"][0]
-        dense_docs = []
-        for i, docid in enumerate(dense_ids):
-            dense_docs.append({
-                "id": docid,
-                "score": 1.0 - dense_res["distances"][0][i]  # chroma distances are 0..1 (similarity) - adjust if needed
-            })
+        q_vec = self._embed_query(query)
+        dense_docs = [{"id": did, "score": scr} for did, scr in self.indexer.search_dense(q_vec, k=top_k)]
         # sparse:
         sparse_res = self.sparse.query(query, topk=top_k)
         sparse_docs = [{"id": sid, "score": scr} for sid,scr in sparse_res]
 
         # combine scores (simple weighted)
-        score_map = {}
+        score_map = defaultdict(float)
         for d in dense_docs:
-            score_map[d["id"]] = score_map.get(d["id"], 0) + 1.0 * d["score"]
+            score_map[d["id"]] += 1.0 * d["score"]
         for s in sparse_docs:
-            score_map[s["id"]] = score_map.get(s["id"], 0) + 0.8 * s["score"]
+            score_map[s["id"]] += 0.8 * s["score"]
 
         # graph expansion: if any table doc hits, include neighbors with small boost
         table_hits = [k for k in score_map.keys() if k.startswith("table::")]
         tables = [k.split("::",1)[1] for k in table_hits]
         neighbors = self.graph.one_hop_neighbors(tables)
         for nb in neighbors:
-            key = f"table::{nb}"
-            score_map[key] = score_map.get(key, 0) + 0.5
+            score_map[f"table::{nb}"] += 0.5
 
         # fetch doc details from chroma for top ids
-        sorted_ids = sorted(score_map.items(), key=lambda x: -x[1])[:top_k]
+        sorted_ids = nlargest(top_k, score_map.items(), key=lambda x: x[1])
         ids_only = [i[0] for i in sorted_ids]
         # query chroma for exact ids
         # chroma supports get with ids
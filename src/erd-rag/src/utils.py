@@ -1,9 +1,13 @@
-import json
+import orjson
 from typing import Any
 
 def save_json(path: str, obj: Any):
-    with open(path, "w", encoding="utf8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+
+def load_json(path: str) -> Any:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 def load_text(path: str) -> str:
     with open(path, "r", encoding="utf8") as f:
@@ -1,8 +1,16 @@
 import subprocess
 import os
+import sys
+import numpy as np
+import pytest
 from src.utils import load_text
 from src.parser import parse_markdown_erd
 from src.enrich import make_table_doc
+from src.rag import build_schema_block
+
+# retriever uses the flat imports the CLI runs with (from config import Config)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from retriever import Retriever
 
 def test_parse_and_enrich():
     md = load_text("src/sample_erd.md")
@@ -12,3 +20,96 @@ def test_parse_and_enrich():
     enriched = make_table_doc(tables["customers"])
     assert "customers" in enriched["table_doc"]["id"]
     assert any(c["id"].startswith("customers::") for c in enriched["col_docs"])
+
+def test_parse_blocks_relations_and_descriptions():
+    md = (
+        "# Shop\n"
+        "### Table: customers\n"
+        "Description: People who buy things.\n"
+        "- `id` (INT) - primary key\n"
+        "### Notes\n"
+        "Description: appendix\n"
+        "### Table: orders\n"
+        "- `order_id` (INT) - primary key\n"
+        "- `cust_id` (INT) - FK -> customers.id\n"
+        "- created_at - timestamp\n"
+    )
+    tables = parse_markdown_erd(md)
+    assert list(tables) == ["customers", "orders"]
+    # non-table headings don't end the current table
+    assert tables["customers"]["description"] == " People who buy things. appendix"
+    assert [c["name"] for c in tables["orders"]["columns"]] == ["order_id", "cust_id", "created_at"]
+    assert tables["orders"]["columns"][2]["type"] is None
+    assert tables["orders"]["relations"] == [{"from_col": "cust_id", "to_table": "customers", "to_col": "id"}]
+
+def test_schema_block_keeps_table_doc_when_column_comes_first():
+    docs = [
+        {"text": "Column `id`", "meta": {"table": "orders", "column": "id"}},
+        {"text": "Table `orders`\nColumns:", "meta": {"table": "orders"}},
+        {"text": "Relation: orders -> customers", "meta": {"from_table": "orders", "to_table": "customers"}},
+    ]
+    block = build_schema_block(docs).splitlines()
+    assert block == [
+        "- Table: orders",
+        "  Table `orders`",
+        "  Columns:",
+        "    - Column `id`",
+        "  Relations:",
+        "    - Relation: orders -> customers",
+    ]
+
+SPARSE_DOCS = [
+    {"id": "table::customers", "text": "Table customers: people who buy things"},
+    {"id": "table::orders", "text": "Table orders: orders placed by customers, with order totals"},
+    {"id": "table::products", "text": "Table products: things for sale"},
+]
+
+def test_sparse_ingest_returns_ids_and_ranks():
+    retr = Retriever(embedder=None, indexer=None)
+    retr.ingest_docs_for_sparse(SPARSE_DOCS)
+    res = retr.sparse.query("orders totals", topk=3)
+    # ids, not texts, come back, and docs without a query term are dropped
+    assert [i for i, _ in res] == ["table::orders"]
+    res = retr.sparse.query("things", topk=3)
+    assert {i for i, _ in res} == {"table::customers", "table::products"}
+    assert all(score > 0 for _, score in res)
+
+def test_retriever_save_load_round_trip(tmp_path):
+    retr = Retriever(embedder=None, indexer=None)
+    retr.ingest_docs_for_sparse(SPARSE_DOCS)
+    retr.graph.add_relations([("orders", "customers")])
+    retr.save(str(tmp_path))
+
+    loaded = Retriever(embedder=None, indexer=None)
+    assert not Retriever(embedder=None, indexer=None).load_persisted(str(tmp_path / "missing"))
+    assert loaded.load_persisted(str(tmp_path))
+    for q in ("orders totals", "things customers"):
+        assert loaded.sparse.query(q, topk=3) == retr.sparse.query(q, topk=3)
+    assert loaded.graph.one_hop_neighbors(["customers"]) == ["orders"]
+
+def _dense_indexer(persist_dir):
+    # the faiss path needs no chroma client (and 0.4 rejects the legacy sqlite settings)
+    from indexer import VectorIndexer
+    idx = VectorIndexer.__new__(VectorIndexer)
+    idx.persist_dir, idx.dense, idx.dense_ids = str(persist_dir), None, []
+    return idx
+
+def test_dense_index_round_trip(tmp_path, monkeypatch):
+    pytest.importorskip("chromadb")
+    faiss = pytest.importorskip("faiss")
+    from config import Config
+    monkeypatch.setattr(Config, "DENSE_QUANT", "int8")
+    vectors = np.random.default_rng(0).normal(size=(5, 16)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(5)]
+    _dense_indexer(tmp_path).build_dense(ids, vectors)
+
+    idx = _dense_indexer(tmp_path)
+    assert idx.load_dense()
+    assert isinstance(idx.dense, faiss.IndexScalarQuantizer)
+    assert idx.dense_ids == ids
+    # k above ntotal: faiss pads with -1 ids, which must not come back
+    res = idx.search_dense(vectors[2], k=10)
+    assert len(res) == 5
+    assert sorted(i for i, _ in res) == ids
+    assert res[0][0] == "doc2" and res[0][1] > 0.95
+    assert not _dense_indexer(tmp_path / "empty").load_dense()
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from pydantic import BaseModel
+from typing import List
 import os, time, json, logging
 
 from llm_med import get_resilient_llm, MODEL_PATH
@@ -8,6 +9,7 @@ from search_tavily import search_evidence
 from ingest import ingest, DATA_DIR, CHROMA_DIR
 from ocr import image_to_text
 from vision import analyse_image
+from pipeline import process_images
 
 logger = logging.getLogger(__name__)
 app = FastAPI(title="MediPal")
@@ -92,6 +94,16 @@ async def upload_image(file: UploadFile = File(...)):
     )
 
 
+@app.post("/summarize-images", summary="Several photos / scans → OCR → redact → LLM summary")
+async def summarize_images(files: List[UploadFile] = File(...)):
+    if any(f.content_type not in ("image/jpeg", "image/png") for f in files):
+        raise HTTPException(400, "Only JPEG/PNG")
+    contents = [await f.read() for f in files]
+    results = await process_images(contents)
+    return [{"filename": f.filename, "ocr_text": r["ocr_text"][:200], "redactions": r["redactions"],
+             "summary": r["summary"]} for f, r in zip(files, results)]
+
+
 @app.post("/ask-web", summary="RAG + optional internet evidence")
 def ask_web(body: AskWeb):
     if not getattr(app.state, "vectorstore", None):
@@ -0,0 +1,63 @@
+import hashlib, io, threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# the same upload is decoded by OCR and the vision classifier; keep a small LRU of
+# decoded pixels keyed on a content digest so the second consumer skips the decode.
+# Bounded by bytes, not entries: one full-resolution phone photo is ~36 MB.
+DECODE_CACHE_BYTES = 128 * 1024 * 1024
+
+_decoded: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_decoded_bytes = 0
+_lock = threading.Lock()
+
+
+def decode_image(file_bytes: bytes, size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """Return the image as a read-only HxWx3 uint8 RGB array, decoding each distinct upload once.
+
+    With `size`, JPEGs are decoded via libjpeg's DCT scaling to the smallest
+    1/2, 1/4 or 1/8 scale that still covers it - for callers that downscale anyway.
+    """
+    global _decoded_bytes
+    key = (hashlib.blake2b(file_bytes, digest_size=8).digest(), size)
+    with _lock:
+        arr = _decoded.get(key)
+        if arr is not None:
+            _decoded.move_to_end(key)
+            return arr
+    img = Image.open(io.BytesIO(file_bytes))
+    if size:
+        img.draft("RGB", size)  # no-op for non-JPEG sources
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    arr = np.asarray(img)
+    arr.flags.writeable = False  # shared between callers
+    if arr.nbytes > DECODE_CACHE_BYTES:
+        return arr
+    with _lock:
+        if key not in _decoded:
+            _decoded[key] = arr
+            _decoded_bytes += arr.nbytes
+        while _decoded_bytes > DECODE_CACHE_BYTES:
+            _decoded_bytes -= _decoded.popitem(last=False)[1].nbytes
+    return arr
+
+
+# a page counts as blank only if almost no pixels of a BLANK_THUMB-px grayscale thumbnail
+# differ from the page's median tone by more than BLANK_DELTA levels. Counting ink pixels
+# keeps a single line of small print on a full-page scan; a global std averages it away.
+BLANK_THUMB = 512
+BLANK_DELTA = 32
+BLANK_MIN_INK = 8
+
+
+def is_blank(arr: np.ndarray) -> bool:
+    """True when a decoded image has no visible ink (blank scan, empty form page)."""
+    thumb = Image.fromarray(arr).convert("L")
+    thumb.thumbnail((BLANK_THUMB, BLANK_THUMB))
+    gray = np.asarray(thumb, dtype=np.int16)
+    ink = np.abs(gray - int(np.median(gray))) > BLANK_DELTA
+    return int(np.count_nonzero(ink)) < BLANK_MIN_INK
@@ -1,4 +1,7 @@
-import os, requests, hashlib, logging
+import os, hashlib, logging, threading, platform, time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import httpx
 from langchain.llms import LlamaCpp
 
 logger = logging.getLogger(__name__)
@@ -6,30 +9,152 @@ logger = logging.getLogger(__name__)
 MODEL_DIR = "models"
 MODEL_URL = os.getenv("MED_MODEL_URL")
 MODEL_PATH = os.path.join(MODEL_DIR, "medalpaca-7b.Q4_K_M.gguf")
+MODEL_SHA = (os.getenv("MED_MODEL_SHA") or "").lower()  # optional sha256 of the GGUF file
+# LLM construction (4 GB weight load / client setup) is shared by every request;
+# the lock keeps concurrent FastAPI worker threads from building it twice
+_LLM_LOCK = threading.RLock()
+LOCAL_LLM_RETRY_SEC = 300  # how long to serve cloud fallbacks before retrying the local model
+_local_failed_at = None
+DOWNLOAD_CHUNK = 1024 * 1024  # 8 KiB chunks make a 4 GB download syscall-bound
+DOWNLOAD_PARTS = 4  # parallel range requests when the server supports them
+
+
+def _sha256_file(path: str) -> str:
+    # hashlib's sha256 is OpenSSL-backed and uses SHA-NI where the CPU has it
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _buffered(r: httpx.Response):
+    """Yield full DOWNLOAD_CHUNK views of one reused buffer, coalescing raw network pieces.
+
+    Each yielded memoryview is only valid until the next iteration.
+    """
+    buf = bytearray(DOWNLOAD_CHUNK)
+    mv = memoryview(buf)
+    n = 0
+    for piece in r.iter_raw():  # Accept-Encoding: identity, so raw bytes are the file bytes
+        piece = memoryview(piece)
+        while piece:
+            take = min(len(piece), DOWNLOAD_CHUNK - n)
+            mv[n:n + take] = piece[:take]
+            n += take
+            piece = piece[take:]
+            if n == DOWNLOAD_CHUNK:
+                yield mv
+                n = 0
+    if n:
+        yield mv[:n]
+
+
+def _fetch_range(client: httpx.Client, fd: int, start: int, end: int):
+    """Download bytes [start, end] of the model and pwrite them at their final offset."""
+    offset = start
+    with client.stream("GET", MODEL_URL, headers={"Range": f"bytes={start}-{end}"}) as r:
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise RuntimeError("Server ignored the Range request")
+        for chunk in _buffered(r):
+            offset += os.pwrite(fd, chunk, offset)
+    if offset != end + 1:
+        raise RuntimeError(f"Incomplete model download for bytes {start}-{end}")
+
+
+def _download(part_path: str) -> str:
+    """Fetch MODEL_URL into part_path and return its sha256 hex digest.
+
+    When the server advertises byte ranges the file is split into DOWNLOAD_PARTS
+    ranges fetched concurrently into a preallocated file, each over its own
+    HTTP/1.1 connection; otherwise it is streamed over a single HTTP/2 connection.
+    """
+    # identity encoding keeps byte ranges and Content-Length in file offsets
+    client_kwargs = dict(follow_redirects=True, headers={"Accept-Encoding": "identity"},
+                         timeout=httpx.Timeout(30.0, read=300.0))
+    with httpx.Client(http2=True, **client_kwargs) as client:
+        # some servers (e.g. GET-signed S3/GCS URLs) reject HEAD; treat that as "no ranges"
+        # and fall back to a single streamed GET
+        try:
+            head = client.head(MODEL_URL)
+            head.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.debug("HEAD %s failed, downloading as one stream: %s", MODEL_URL, e)
+            head = None
+        size = int(head.headers.get("Content-Length") or 0) if head is not None else 0
+        ranged = size > 0 and head.headers.get("Accept-Ranges") == "bytes" and hasattr(os, "pwrite")
+        with open(part_path, "wb") as f:
+            if size and hasattr(os, "posix_fallocate"):
+                # reserve the whole file up front to avoid fragmenting a multi-GB write
+                os.posix_fallocate(f.fileno(), 0, size)
+            if ranged:
+                step = -(-size // DOWNLOAD_PARTS)
+                bounds = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+                # HTTP/2 would multiplex every range onto one TCP connection; separate
+                # HTTP/1.1 connections give each range its own congestion window
+                limits = httpx.Limits(max_connections=len(bounds), max_keepalive_connections=len(bounds))
+                with httpx.Client(http2=False, limits=limits, **client_kwargs) as ranges, \
+                        ThreadPoolExecutor(max_workers=len(bounds)) as ex:
+                    for fut in [ex.submit(_fetch_range, ranges, f.fileno(), a, b) for a, b in bounds]:
+                        fut.result()
+            else:
+                h = hashlib.sha256()
+                with client.stream("GET", MODEL_URL) as r:
+                    r.raise_for_status()
+                    for chunk in _buffered(r):
+                        h.update(chunk)
+                        f.write(chunk)
+                f.truncate()
+    # ranges land out of order, so hash the finished file instead of the stream
+    return _sha256_file(part_path) if ranged else h.hexdigest()
 
 
 def download_once():
     os.makedirs(MODEL_DIR, exist_ok=True)
+    if os.path.exists(MODEL_PATH) and MODEL_SHA and _sha256_file(MODEL_PATH) != MODEL_SHA:
+        logger.warning("Model file %s does not match MED_MODEL_SHA; re-downloading", MODEL_PATH)
+        os.remove(MODEL_PATH)
     if not os.path.exists(MODEL_PATH):
         if not MODEL_URL:
             raise RuntimeError("MED_MODEL_URL is not set; cannot download MedAlpaca model")
         print("Downloading MedAlpaca-7B quantized (≈ 4 GB) …")
-        with requests.get(MODEL_URL, stream=True) as r:
-            r.raise_for_status()
-            with open(MODEL_PATH, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        # write to a side file so an interrupted download never looks like a finished model
+        part_path = MODEL_PATH + ".part"
+        digest = _download(part_path)
+        if MODEL_SHA and digest != MODEL_SHA:
+            os.remove(part_path)
+            raise RuntimeError(f"Downloaded model checksum {digest} does not match MED_MODEL_SHA")
+        os.replace(part_path, MODEL_PATH)
     return MODEL_PATH
 
 
 def get_med_llm():
     """Return a local LlamaCpp instance. This may raise if the model isn't available."""
+    with _LLM_LOCK:
+        return _load_med_llm()
+
+
+def _default_gpu_layers() -> int:
+    # Apple Silicon: offload every layer to Metal; elsewhere stay on CPU unless configured
+    env = os.getenv("MED_N_GPU_LAYERS")
+    if env:
+        return int(env)
+    if platform.system() == "Darwin" and platform.machine() == "arm64":
+        return -1
+    return 0
+
+
+@lru_cache(maxsize=1)
+def _load_med_llm():
     return LlamaCpp(
         model_path=download_once(),
         n_ctx=2048,
         temperature=0.3,
         max_tokens=512,
-        n_threads=8,           # adjust to your CPU
+        n_threads=os.cpu_count(),
+        n_batch=2048,          # large prompt-processing batches for the Q4 SIMD kernels
+        n_gpu_layers=_default_gpu_layers(),
+        use_mmap=True,
+        f16_kv=True,
+        model_kwargs={"n_ubatch": 512},
     )
 
 
@@ -37,26 +162,44 @@ def get_resilient_llm():
     """Prefer a local MedAlpaca LLM; if it cannot be created, fall back to
     OpenAI or Google Gemini (when configured). Returns an LLM object or None.
     """
-    # 1) try local MedAlpaca
-    try:
-        return get_med_llm()
-    except Exception as e:
-        logger.debug("Local Med LLM unavailable: %s", e)
-
-    # 2) try OpenAI (if key present)
-    if os.getenv("OPENAI_API_KEY"):
-        try:
-            from langchain.llms import OpenAI
-            return OpenAI(model="gpt-3.5-turbo-instruct", temperature=0.3)
-        except Exception as e:
-            logger.debug("OpenAI init failed: %s", e)
+    global _local_failed_at
+    with _LLM_LOCK:
+        # 1) try local MedAlpaca; a failure (e.g. a dropped download) is retried after
+        # LOCAL_LLM_RETRY_SEC rather than pinning the process to a cloud fallback
+        if _local_failed_at is None or time.monotonic() - _local_failed_at >= LOCAL_LLM_RETRY_SEC:
+            try:
+                llm = get_med_llm()
+                _local_failed_at = None
+                return llm
+            except Exception as e:
+                logger.debug("Local Med LLM unavailable: %s", e)
+                _local_failed_at = time.monotonic()
+
+        # 2) try OpenAI (if key present)
+        if os.getenv("OPENAI_API_KEY"):
+            try:
+                return _openai_llm()
+            except Exception as e:
+                logger.debug("OpenAI init failed: %s", e)
+
+        # 3) try Gemini (Google) if credentials set
+        if os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+            try:
+                return _gemini_llm()
+            except Exception as e:
+                logger.debug("Gemini init failed: %s", e)
+
+        return None
+
+
+# fallback clients are reused once built; lru_cache does not cache a raised exception
+@lru_cache(maxsize=1)
+def _openai_llm():
+    from langchain.llms import OpenAI
+    return OpenAI(model="gpt-3.5-turbo-instruct", temperature=0.3)
 
-    # 3) try Gemini (Google) if credentials set
-    if os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
-        try:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3)
-        except Exception as e:
-            logger.debug("Gemini init failed: %s", e)
 
-    return None
\ No newline at end of file
+@lru_cache(maxsize=1)
+def _gemini_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3)
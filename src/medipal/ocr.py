@@ -1,8 +1,18 @@
-import easyocr, io, logging, os
+import easyocr, logging, os
+import numpy as np
 from PIL import Image
+from typing import List
+
+from images import decode_image, is_blank
 
 logger = logging.getLogger(__name__)
 
+# batched EasyOCR needs a common input size; below OCR_BATCH_MIN images the
+# per-image path is as fast, so small uploads stay sequential
+OCR_WIDTH, OCR_HEIGHT = 800, 600
+OCR_BATCH_MIN = 4
+GOOGLE_VISION_BATCH = 16  # max images per batch_annotate_images request
+
 # initialize EasyOCR reader if possible; keep gracefully handling failures so the
 # module can be imported even on systems without GPU or with missing deps.
 reader = None
@@ -11,6 +21,14 @@ try:
 except Exception:
     logger.debug("EasyOCR not available or failed to init; will try Google Vision as fallback")
 
+if reader:
+    # warm up on one blank image so the first real request doesn't pay for lazy model/kernel init
+    try:
+        reader.readtext_batched(np.zeros([1, OCR_HEIGHT, OCR_WIDTH, 3], dtype=np.uint8),
+                                n_width=OCR_WIDTH, n_height=OCR_HEIGHT, detail=0)
+    except Exception as e:
+        logger.debug("EasyOCR warm-up failed: %s", e)
+
 
 def _google_vision_ocr(file_bytes: bytes) -> str:
     """Try Google Cloud Vision OCR as a fallback when EasyOCR fails or returns nothing.
@@ -33,16 +51,49 @@ def _google_vision_ocr(file_bytes: bytes) -> str:
         return ""
 
 
+def _google_vision_ocr_batch(files: List[bytes]) -> List[str]:
+    """Google Vision OCR for several images, up to GOOGLE_VISION_BATCH per request.
+
+    Returns one string per input (empty where no text was found or the call failed).
+    """
+    texts = [""] * len(files)
+    try:
+        from google.cloud import vision
+        client = vision.ImageAnnotatorClient()
+        feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+        for start in range(0, len(files), GOOGLE_VISION_BATCH):
+            reqs = [vision.AnnotateImageRequest(image=vision.Image(content=b), features=[feature])
+                    for b in files[start:start + GOOGLE_VISION_BATCH]]
+            resp = client.batch_annotate_images(requests=reqs)
+            for i, r in enumerate(resp.responses, start):
+                if getattr(r, "error", None) and getattr(r.error, "message", None):
+                    logger.debug("Google Vision OCR error: %s", r.error.message)
+                    continue
+                annotations = getattr(r, "text_annotations", [])
+                texts[i] = annotations[0].description.strip() if annotations else ""
+    except Exception as e:
+        logger.debug("Google Vision batch OCR unavailable or failed: %s", e)
+    return texts
+
+
 def image_to_text(file_bytes: bytes) -> str:
     """Return extracted text from an image. Try local EasyOCR first, then Google Vision.
 
-    Returns an empty string if no OCR result was found.
+    Returns an empty string if no OCR result was found, or without running OCR
+    at all if the image is blank.
     """
+    try:
+        arr = decode_image(file_bytes)
+        if is_blank(arr):
+            return ""
+    except Exception as e:
+        logger.debug("Image decode failed: %s", e)
+        arr = None
+
     # 1) try EasyOCR if initialized
     try:
-        if reader:
-            image = Image.open(io.BytesIO(file_bytes)).convert("RGB")
-            result = reader.readtext(image, detail=0)
+        if reader and arr is not None:
+            result = reader.readtext(arr, detail=0)
             text = " ".join(result).strip()
             if text:
                 return text
@@ -58,4 +109,35 @@ def image_to_text(file_bytes: bytes) -> str:
 
     # final fallback: empty string
     logger.warning("OCR produced no text (EasyOCR + Google Vision fallback exhausted)")
-    return ""
\ No newline at end of file
+    return ""
+
+
+def image_to_text_batched(files: List[bytes]) -> List[str]:
+    """Return extracted text for several images, running EasyOCR over them as one batch.
+
+    Images are resized to OCR_WIDTH x OCR_HEIGHT for the batch; any image left
+    without text falls back to Google Vision, batched into as few requests as possible.
+    """
+    if not reader or len(files) < OCR_BATCH_MIN:
+        return [image_to_text(b) for b in files]
+
+    texts = [""] * len(files)
+    blank = set()
+    try:
+        drafts = [decode_image(b, (OCR_WIDTH, OCR_HEIGHT)) for b in files]
+        blank = {i for i, arr in enumerate(drafts) if is_blank(arr)}
+        todo = [i for i in range(len(files)) if i not in blank]
+        if todo:
+            images = [np.asarray(Image.fromarray(drafts[i]).resize((OCR_WIDTH, OCR_HEIGHT))) for i in todo]
+            results = reader.readtext_batched(images, n_width=OCR_WIDTH, n_height=OCR_HEIGHT, detail=0)
+            for i, r in zip(todo, results):
+                texts[i] = " ".join(r).strip()
+    except Exception as e:
+        logger.debug("EasyOCR batched processing failed: %s", e)
+
+    google_creds = os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or os.getenv("GEMINI_API_KEY")
+    missing = [i for i, text in enumerate(texts) if not text and i not in blank]
+    if google_creds and missing:
+        for i, text in zip(missing, _google_vision_ocr_batch([files[i] for i in missing])):
+            texts[i] = text
+    return texts
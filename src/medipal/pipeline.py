@@ -0,0 +1,90 @@
+import asyncio, logging
+from typing import Dict, List
+
+from ocr import image_to_text_batched
+from redact import redact_for_api
+from llm_med import get_resilient_llm
+
+logger = logging.getLogger(__name__)
+
+# OCR -> redact -> LLM run as three stages joined by bounded queues, so CPU OCR of
+# the next image overlaps with inference on the previous ones. The LLM stage
+# flushes a batch when it is full or LLM_FLUSH_SEC after its first item.
+# OCR runs batched over OCR_CHUNK images at a time, so later chunks still overlap
+# with summaries of earlier ones.
+QUEUE_SIZE = 8
+OCR_CHUNK = 8
+LLM_MAX_BATCH = 8
+LLM_FLUSH_SEC = 0.05
+
+SUMMARY_PROMPT = "Summarize the key medical facts in this document briefly.\nDocument:\n{text}\nSummary:"
+
+_DONE = object()
+
+
+def _generate(llm, prompts: List[str]) -> List[str]:
+    """Run one batched LLM call; chat models return messages, plain LLMs strings."""
+    try:
+        outs = llm.batch(prompts)
+        return [getattr(o, "content", o) for o in outs]
+    except Exception:
+        logger.exception("Batched LLM call failed")
+        return [""] * len(prompts)
+
+
+async def process_images(files: List[bytes]) -> List[Dict]:
+    """OCR, redact and summarise each image; results are returned in input order.
+
+    Only redacted text is sent to the LLM.
+    """
+    loop = asyncio.get_running_loop()
+    ocr_q: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+    llm_q: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+    results: List[Dict] = [{"ocr_text": "", "redacted_text": "", "redactions": {}, "summary": ""} for _ in files]
+
+    async def ocr_stage():
+        for start in range(0, len(files), OCR_CHUNK):
+            # image_to_text_batched falls back to per-image OCR below OCR_BATCH_MIN
+            texts = await loop.run_in_executor(None, image_to_text_batched, files[start:start + OCR_CHUNK])
+            for i, text in enumerate(texts, start):
+                results[i]["ocr_text"] = text
+                await ocr_q.put(i)
+        await ocr_q.put(_DONE)
+
+    async def redact_stage():
+        while (i := await ocr_q.get()) is not _DONE:
+            results[i]["redacted_text"], results[i]["redactions"] = redact_for_api(results[i]["ocr_text"])
+            await llm_q.put(i)
+        await llm_q.put(_DONE)
+
+    async def llm_stage():
+        llm = await loop.run_in_executor(None, get_resilient_llm)
+        done = False
+        while not done:
+            batch = [await llm_q.get()]
+            deadline = loop.time() + LLM_FLUSH_SEC
+            while len(batch) < LLM_MAX_BATCH and batch[-1] is not _DONE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(llm_q.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if batch[-1] is _DONE:
+                done = True
+                batch.pop()
+            # nothing to summarise for images without text
+            batch = [i for i in batch if results[i]["redacted_text"]]
+            if not batch or llm is None:
+                continue
+            prompts = [SUMMARY_PROMPT.format(text=results[i]["redacted_text"]) for i in batch]
+            summaries = await loop.run_in_executor(None, _generate, llm, prompts)
+            for i, summary in zip(batch, summaries):
+                results[i]["summary"] = summary
+
+    # a failing stage cancels the others instead of leaving them blocked on the queues
+    async with asyncio.TaskGroup() as tg:
+        for stage in (ocr_stage, redact_stage, llm_stage):
+            tg.create_task(stage())
+    return results
@@ -1,5 +1,14 @@
-import re
-from typing import Tuple, Dict, List
+import logging, re, threading
+from collections import Counter
+from functools import lru_cache
+from typing import Tuple, Dict, List, Optional
+
+try:
+    import hyperscan  # optional: SIMD multi-pattern matcher, much faster on long OCR transcripts
+except ImportError:
+    hyperscan = None
+
+logger = logging.getLogger(__name__)
 
 # Simple regex-based PII redaction. This is best-effort and not a
 # substitute for a full PII detection pipeline. Patterns can be extended.
@@ -10,16 +19,121 @@ PATTERNS = {
     "phone": (re.compile(r"\+?\d[\d\-\.\s()]{7,}\d"), "[REDACTED_PHONE]"),
     # US SSN-like
     "ssn": (re.compile(r"\b\d{3}-\d{2}-\d{4}\b"), "[REDACTED_SSN]"),
-    # credit card-ish numbers (13-16 digits, allowing spaces/dashes)
-    "credit_card": (re.compile(r"\b(?:\d[ -]*?){13,16}\b"), "[REDACTED_CREDIT_CARD]"),
+    # credit card-ish numbers (13-16 digits, single space/dash separators); each
+    # digit is consumed exactly once, so matching stays linear on long digit runs
+    "credit_card": (re.compile(r"\b\d(?:[ -]?\d){12,15}\b"), "[REDACTED_CREDIT_CARD]"),
     # dates common formats MM/DD/YYYY or DD-MM-YYYY, YYYY-MM-DD etc.
     "date": (re.compile(r"\b(?:\d{1,4}[/\-.]\d{1,2}[/\-.]\d{1,4})\b"), "[REDACTED_DATE]"),
     # simple MRN / patient id tokens
     "mrn": (re.compile(r"\b(MRN|Patient\s*ID|PID)[:#\s]*[A-Za-z0-9\-]+\b", re.I), "[REDACTED_MRN]"),
 }
 
+TOKENS = {key: token for key, (_, token) in PATTERNS.items()}
+
+# cheap necessary conditions: a pattern whose check fails cannot match, so it is left
+# out of the scan; each check gets the text and its lowercased form, or None for
+# non-ASCII text, where re.I also folds letters like "İ" and "ı" onto "i"
+_has_digit = re.compile(r"\d").search
+PRECHECKS = {
+    "email": lambda s, low: "@" in s,
+    "phone": lambda s, low: _has_digit(s) is not None,
+    "ssn": lambda s, low: "-" in s and _has_digit(s) is not None,
+    "credit_card": lambda s, low: _has_digit(s) is not None,
+    "date": lambda s, low: ("/" in s or "-" in s or "." in s) and _has_digit(s) is not None,
+    "mrn": lambda s, low: low is None or "mrn" in low or "patient" in low or "pid" in low,
+}
+
+
+@lru_cache(maxsize=None)
+def _combined(keys: Tuple[str, ...]) -> "re.Pattern":
+    """Union the selected PATTERNS into one alternation of named groups.
+
+    Each alternative keeps its own flags via a scoped inline group, and
+    m.lastgroup tells the replacement callback which pattern matched.
+    """
+    parts = []
+    for key in keys:
+        pat = PATTERNS[key][0]
+        body = f"(?i:{pat.pattern})" if pat.flags & re.I else pat.pattern
+        parts.append(f"(?P<{key}>{body})")
+    return re.compile("|".join(parts))
+
+
+@lru_cache(maxsize=None)
+def _hs_database(keys: Tuple[str, ...]) -> Optional[tuple]:
+    """Compile the selected PATTERNS into one Hyperscan database, or None if unavailable.
+
+    Returns (database, lock); a database owns a single scratch space, so scans are serialized.
+    """
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[PATTERNS[key][0].pattern.encode() for key in keys],
+            ids=list(range(len(keys))),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST | (hyperscan.HS_FLAG_CASELESS if PATTERNS[key][0].flags & re.I else 0)
+                   for key in keys],
+        )
+    except Exception as e:
+        logger.debug("Hyperscan compile failed, using re: %s", e)
+        return None
+    return db, threading.Lock()
+
+
+# ASCII characters Python's \s matches but Hyperscan's does not (file/group/record/unit separators)
+_HS_SPACE_GAP = re.compile(r"[\x1c-\x1f]").search
+
+
+def _hs_sub(keys: Tuple[str, ...], text: str, counts: Counter) -> Optional[str]:
+    """Replace matches of the selected patterns via Hyperscan; None means fall back to re."""
+    # Hyperscan's \w and \b are ASCII-only (Unicode mode makes these patterns too large
+    # to compile) and its \s lacks \x1c-\x1f, so only ASCII text without those
+    # separators is guaranteed to match exactly as re would
+    compiled = _hs_database(keys) if text.isascii() and not _HS_SPACE_GAP(text) else None
+    if compiled is None:
+        return None
+    db, lock = compiled
+    data = text.encode()
+    hits = []
+
+    def on_match(pid, start, end, flags, context):
+        hits.append((start, pid, -end))
+
+    with lock:
+        db.scan(data, match_event_handler=on_match)
+    # Hyperscan reports every end offset; keep re's semantics of leftmost start,
+    # first listed pattern, longest match, then resume after it
+    hits.sort()
+    parts, pos = [], 0
+    for start, pid, neg_end in hits:
+        if start < pos:
+            if -neg_end > pos:
+                # only the leftmost start is reported, so a match beginning inside this
+                # one may be hidden; let re finish the rest of the text from here
+                break
+            continue
+        key = keys[pid]
+        parts += (data[pos:start], TOKENS[key].encode())
+        counts[key] += 1
+        pos = -neg_end
+    else:
+        parts.append(data[pos:])
+        return b"".join(parts).decode()
+
+    i = pos  # ASCII, so byte offsets are character offsets
+    out = [b"".join(parts).decode()]
+    for m in _combined(keys).finditer(text, i):
+        counts[m.lastgroup] += 1
+        out += (text[i:m.start()], TOKENS[m.lastgroup])
+        i = m.end()
+    out.append(text[i:])
+    return "".join(out)
+
+
 # Field-style name capture: "Name: John Doe" -> redact value
-NAME_FIELD_RE = re.compile(r"\b(?:Patient\s*Name|Name|Full\s*Name)\s*[:\-]\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})", re.I)
+# group 1 is the label plus separator, group 2 the name, so the replacement is rebuilt without re-searching
+NAME_FIELD_RE = re.compile(r"\b((?:Patient\s*Name|Name|Full\s*Name)\s*[:\-]\s*)([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})", re.I)
 
 
 def redact_for_api(text: str, types: List[str] = None) -> Tuple[str, Dict[str, int]]:
@@ -29,27 +143,29 @@ def redact_for_api(text: str, types: List[str] = None) -> Tuple[str, Dict[str, i
     """
     if not text:
         return text, {}
-    counts: Dict[str, int] = {}
-    out = text
+    counts: Counter = Counter()
 
-    sel = types if types else list(PATTERNS.keys())
-    for key in sel:
-        pat, token = PATTERNS[key]
-        new, n = pat.subn(token, out)
-        if n:
-            counts[key] = counts.get(key, 0) + n
-            out = new
+    low = text.lower() if text.isascii() else None
+    sel = tuple(key for key in (types or PATTERNS) if PRECHECKS.get(key, lambda s, low: True)(text, low))
 
-    # redact name fields like "Name: John Doe"
-    def _name_repl(m: re.Match) -> str:
-        name_val = m.group(1)
-        return m.group(0).replace(name_val, "[REDACTED_NAME]")
+    # one scan for all selected patterns; at each position the first listed pattern wins
+    def _repl(m: re.Match) -> str:
+        counts[m.lastgroup] += 1
+        return TOKENS[m.lastgroup]
 
-    out, n = NAME_FIELD_RE.subn(_name_repl, out)
-    if n:
-        counts["name_field"] = counts.get("name_field", 0) + n
+    out = text
+    if sel:
+        out = _hs_sub(sel, text, counts)
+        if out is None:
+            out = _combined(sel).sub(_repl, text)
+
+    # redact name fields like "Name: John Doe"; redaction tokens never contain "name"
+    if low is None or "name" in low:
+        out, n = NAME_FIELD_RE.subn(r"\1[REDACTED_NAME]", out)
+        if n:
+            counts["name_field"] = counts.get("name_field", 0) + n
 
-    return out, counts
+    return out, dict(counts)
 
 
 def redact_query(query: str) -> str:
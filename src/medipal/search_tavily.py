@@ -1,11 +1,32 @@
-from tavily import TavilyClient
-import os
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+import requests, os, logging
+
+logger = logging.getLogger(__name__)
+
+TAVILY_URL = "https://api.tavily.com/search"
+TAVILY_TIMEOUT = 10  # seconds; web evidence is optional, never hang a request on it
+
+
+@lru_cache(maxsize=1)
+def _get_session() -> requests.Session:
+    # one pooled session keeps the TLS connection to Tavily alive between queries
+    # (TavilyClient posts through a fresh connection every call)
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return session
+
 
 def search_evidence(query: str, max_results=3) -> str:
     key = os.getenv("TAVILY_API_KEY")
     if not key:
         return ""
-    client = TavilyClient(api_key=key)
-    resp = client.search(query, search_depth="basic", max_results=max_results)
-    snippets = [r["content"] for r in resp["results"]]
-    return "\n".join(snippets)
\ No newline at end of file
+    payload = {"api_key": key, "query": query, "search_depth": "basic", "max_results": max_results}
+    try:
+        resp = _get_session().post(TAVILY_URL, json=payload, timeout=TAVILY_TIMEOUT)
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        logger.debug("Tavily search failed: %s", e)
+        return ""
+    snippets = [r["content"] for r in resp.json().get("results", [])]
+    return "\n".join(snippets)
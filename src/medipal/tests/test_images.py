@@ -0,0 +1,35 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from images import decode_image, is_blank
+
+
+def _scan(lines, font_px=50):
+    """A 300-dpi A4 page as JPEG bytes, with mild sensor noise; 50 px is about 12pt."""
+    page = Image.new("L", (2480, 3508), 245)
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=font_px)
+    for k, line in enumerate(lines):
+        draw.text((200, 300 + 2 * font_px * k), line, fill=20, font=font)
+    noise = np.random.default_rng(0).normal(0, 6, (3508, 2480))
+    pixels = np.clip(np.asarray(page) + noise, 0, 255).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).convert("RGB").save(buf, "JPEG", quality=60)
+    return buf.getvalue()
+
+
+def test_blank_page_is_blank():
+    assert is_blank(decode_image(_scan([])))
+
+
+def test_single_line_full_page_scan_is_not_blank():
+    scan = _scan(["Glucose 212 mg/dL Potassium 6.1 mmol/L"])
+    assert not is_blank(decode_image(scan))
+    # the batched OCR path checks JPEG-draft decodes
+    assert not is_blank(decode_image(scan, (800, 600)))
+
+
+def test_short_small_print_is_not_blank():
+    assert not is_blank(decode_image(_scan(["K 6.1"], font_px=42)))
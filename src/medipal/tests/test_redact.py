@@ -0,0 +1,71 @@
+import random
+from collections import Counter
+
+import pytest
+
+import redact
+from redact import redact_for_api
+
+
+def test_combined_pass_first_listed_pattern_wins():
+    # mrn and phone both match at the same offset; the single pass keeps whichever
+    # starts first, so the label is consumed with the number
+    assert redact_for_api("MRN: 12345678901") == ("[REDACTED_MRN]", {"mrn": 1})
+    out, counts = redact_for_api("write to a@b.com on 01/02/2024, call 555-123-4567")
+    assert out == "write to [REDACTED_EMAIL] on [REDACTED_DATE], call [REDACTED_PHONE]"
+    assert counts == {"email": 1, "date": 1, "phone": 1}
+
+
+def test_types_restricts_patterns():
+    out, counts = redact_for_api("a@b.com 555-123-4567", types=["email"])
+    assert out == "[REDACTED_EMAIL] 555-123-4567"
+    assert counts == {"email": 1}
+
+
+def test_name_field_keeps_label():
+    out, counts = redact_for_api("Patient Name: John Doe. Full name - Mary Smith.")
+    assert out == "Patient Name: [REDACTED_NAME]. Full name - [REDACTED_NAME]."
+    assert counts == {"name_field": 2}
+
+
+def test_prechecks_skip_scan_when_nothing_can_match(monkeypatch):
+    def fail(*args):
+        raise AssertionError("pattern scan should have been skipped")
+
+    monkeypatch.setattr(redact, "_combined", fail)
+    monkeypatch.setattr(redact, "_hs_sub", fail)
+    assert redact_for_api("no identifiers in this sentence") == ("no identifiers in this sentence", {})
+
+
+def test_prechecks_fall_back_for_non_ascii_case_folding():
+    # re.I matches "İ" against "i", which a lowercase substring check would miss
+    assert redact_for_api("PİD 1234") == ("[REDACTED_MRN]", {"mrn": 1})
+
+
+def _re_sub(keys, text):
+    counts = Counter()
+
+    def repl(m):
+        counts[m.lastgroup] += 1
+        return redact.TOKENS[m.lastgroup]
+
+    return redact._combined(keys).sub(repl, text), counts
+
+
+def test_hyperscan_matches_re():
+    pytest.importorskip("hyperscan")
+    keys = tuple(redact.PATTERNS)
+    samples = [
+        "Contact john.doe@example.com or +1 (555) 123-4567. SSN 123-45-6789, DOB 03/04/1990, MRN: A12345",
+        "card 4111 1111 1111 1111 and 4111-1111-1111-1111, pid 777",
+        "75\x1c5\x1c6132",  # re's \s also covers \x1c-\x1f; Hyperscan's does not
+    ]
+    rng = random.Random(0)
+    alphabet = "abc 0123456789-/.@:#MRNpid()+\n\t\x1c\x1f"
+    samples += ["".join(rng.choice(alphabet) for _ in range(120)) for _ in range(2000)]
+    for text in samples:
+        counts = Counter()
+        out = redact._hs_sub(keys, text, counts)
+        if out is not None:
+            assert (out, counts) == _re_sub(keys, text), repr(text)
+    assert redact_for_api("75\x1c5\x1c6132") == ("[REDACTED_PHONE]", {"phone": 1})
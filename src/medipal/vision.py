@@ -1,7 +1,9 @@
 from transformers import pipeline
 from PIL import Image
-import io, os, logging
-+
+import os, logging
+
+from images import decode_image
+
 logger = logging.getLogger(__name__)
 
 MODEL_NAME = os.getenv("VISION_MODEL")
@@ -41,7 +43,7 @@ def analyse_image(file_bytes: bytes) -> dict:
     # local pipeline
     try:
         if clf:
-            image = Image.open(io.BytesIO(file_bytes)).convert("RGB")
+            image = Image.fromarray(decode_image(file_bytes))
             preds = clf(image, top_k=3)
             return {"predictions": [{"label": p.get("label") or p["label"], "score": round(p.get("score", 0), 3)} for p in preds]}
     except Exception as e:
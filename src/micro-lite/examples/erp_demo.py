@@ -1,9 +1,39 @@
 from microlite.llm import BaseGenerator
 from microlite.registry import FunctionRegistry
 from microlite.agent import Agent
+import copy
+import re
+from collections import defaultdict
 from typing import List, Dict, Any
 
 
+# Intent table in priority order: (keywords, function_call). All keywords are matched
+# in one regex pass and the highest-priority intent with a hit wins, so the more
+# specific "list orders" / "orders for" is checked before the bare "order".
+INTENTS = [
+    (("list orders", "orders for"),
+     {"type": "function_call", "name": "list_orders", "args": {"customer_id": "C123"}}),
+    (("create order", "place order", "order"),
+     {
+         "type": "function_call",
+         "name": "create_order",
+         "args": {
+             "customer_id": "C123",
+             "items": [{"sku": "SKU1", "qty": 2}, {"sku": "SKU2", "qty": 1}]
+         }
+     }),
+    (("inventory", "stock", "check"),
+     {"type": "function_call", "name": "get_inventory", "args": {"sku": "SKU1"}}),
+    (("customer",),
+     {"type": "function_call", "name": "get_customer", "args": {"customer_id": "C123"}}),
+]
+
+_KEYWORD_PRIORITY = {kw: prio for prio, (kws, _) in enumerate(INTENTS) for kw in kws}
+# a zero-width lookahead tries every position, so overlapping keywords ("create orders for")
+# are all seen; alternatives in priority order report the best keyword starting at each one
+_KEYWORD_RE = re.compile("(?=(" + "|".join(re.escape(kw) for kw in _KEYWORD_PRIORITY) + "))")
+
+
 class DeterministicLLM(BaseGenerator):
     """Simple deterministic LLM simulator that inspects the prompt and
     returns structured function_call responses for demo purposes.
@@ -22,29 +52,10 @@ class DeterministicLLM(BaseGenerator):
                 p_raw = prompt
 
         p = p_raw.strip().splitlines()[0].lower() if p_raw.strip() else prompt.lower()
-        # create order intent
-        if "create order" in p or "place order" in p or "order" in p:
-            # return a sample structured call for create_order
-            return {
-                "type": "function_call",
-                "name": "create_order",
-                "args": {
-                    "customer_id": "C123",
-                    "items": [{"sku": "SKU1", "qty": 2}, {"sku": "SKU2", "qty": 1}]
-                }
-            }
-
-        # check inventory intent
-        if "inventory" in p or "stock" in p or "check" in p:
-            return {"type": "function_call", "name": "get_inventory", "args": {"sku": "SKU1"}}
-
-        # list orders
-        if "list orders" in p or "orders for" in p:
-            return {"type": "function_call", "name": "list_orders", "args": {"customer_id": "C123"}}
-
-        # get customer
-        if "customer" in p:
-            return {"type": "function_call", "name": "get_customer", "args": {"customer_id": "C123"}}
+        hits = {_KEYWORD_PRIORITY[m.group(1)] for m in _KEYWORD_RE.finditer(p)}
+        if hits:
+            # copy so callers (e.g. create_order storing items) never share the template
+            return copy.deepcopy(INTENTS[min(hits)][1])
 
         return {"type": "text", "text": "I didn't understand that in demo mode."}
 
@@ -54,6 +65,8 @@ class DeterministicLLM(BaseGenerator):
 inventory = {"SKU1": 10, "SKU2": 5}
 customers = {"C123": {"name": "Acme Corp", "email": "poc@acme.example"}}
 orders: List[Dict[str, Any]] = []
+# customer_id -> that customer's orders, kept in step with `orders`
+orders_by_customer: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
 
 
 def register_erp_functions(registry: FunctionRegistry):
@@ -83,11 +96,12 @@ def register_erp_functions(registry: FunctionRegistry):
         order_id = f"ORD{len(orders)+1:04d}"
         order = {"order_id": order_id, "customer_id": customer_id, "items": items}
         orders.append(order)
+        orders_by_customer[customer_id].append(order)
         return {"order_id": order_id, "status": "created"}
 
     @registry.register(description="List orders for a customer")
     def list_orders(customer_id: str):
-        return [o for o in orders if o["customer_id"] == customer_id]
+        return list(orders_by_customer.get(customer_id, ()))
 
     @registry.register(description="Update inventory for a SKU by delta (can be negative)")
     def update_inventory(sku: str, delta: int):
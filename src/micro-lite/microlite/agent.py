@@ -1,16 +1,21 @@
 # microlite/agent.py
 from .llm import BaseGenerator
 from .registry import FunctionRegistry
-from .templates import render_prompt
+from .templates import compile_prompt
 
 class Agent:
     def __init__(self, generator: BaseGenerator, registry: FunctionRegistry):
         self.generator = generator
         self.registry = registry
+        self._funcs = self.registry.list_specs()
+        self._render = compile_prompt(self._funcs)
 
     def run(self, user_input: str):
         funcs = self.registry.list_specs()
-        prompt = render_prompt(user_input, funcs)
+        if funcs is not self._funcs:
+            # registry changed since the prompt was compiled
+            self._funcs, self._render = funcs, compile_prompt(funcs)
+        prompt = self._render(user_input)
         result = self.generator.generate(prompt, functions=funcs)
         if result["type"] == "function_call":
             name = result["name"]
@@ -2,6 +2,7 @@
 from typing import Callable, Dict, Any
 import inspect
 from dataclasses import dataclass
+from functools import lru_cache
 import json
 
 
@@ -16,26 +17,29 @@ class FunctionSpec:
 class FunctionRegistry:
     def __init__(self):
         self._store: Dict[str, FunctionSpec] = {}
+        # list_specs() result; rebuilt only after a register()
+        self._specs_cache = None
 
     def register(self, name: str = None, description: str = ""):
         def _decor(fn):
             n = name or fn.__name__
             sig = str(inspect.signature(fn))
             self._store[n] = FunctionSpec(fn=fn, name=n, description=description, signature=sig)
+            self._specs_cache = None
             return fn
 
         return _decor
 
     def list_specs(self):
-        # return simplified metadata suitable for prompts
-        out = []
-        for spec in self._store.values():
-            out.append({
+        # return simplified metadata suitable for prompts; the same tuple is
+        # returned until the next register(), so callers can key caches on it
+        if self._specs_cache is None:
+            self._specs_cache = tuple({
                 "name": spec.name,
                 "description": spec.description,
                 "signature": spec.signature,
-            })
-        return out
+            } for spec in self._store.values())
+        return self._specs_cache
 
     def call(self, name: str, argstr_or_args: Any = ""):
         """
@@ -47,47 +51,67 @@ class FunctionRegistry:
         - JSON string: parsed and dispatched
         - k=v pairs string: legacy support
         - empty string: call with no args
+        - anything else: passed as a single positional arg
         """
         spec = self._store.get(name)
         if not spec:
             raise KeyError(f"Function {name} not found")
 
-        # If caller passed a mapping (common with LLM structured args), use it directly
-        if isinstance(argstr_or_args, dict):
-            return spec.fn(**argstr_or_args)
-
-        # If caller passed a list/tuple, call positionally
-        if isinstance(argstr_or_args, (list, tuple)):
-            return spec.fn(*argstr_or_args)
-
-        # Strings: try JSON, then k=v parsing, then single positional
-        if isinstance(argstr_or_args, str):
-            s = argstr_or_args.strip()
-            if not s:
-                return spec.fn()
-
-            # attempt JSON parsing
-            try:
-                parsed = json.loads(s)
-                if isinstance(parsed, dict):
-                    return spec.fn(**parsed)
-                if isinstance(parsed, list):
-                    return spec.fn(*parsed)
-            except Exception:
-                pass
-
-            # legacy k=v parsing
-            if "=" in s:
-                kwargs = {}
-                for kv in s.split():
-                    if "=" not in kv:
-                        continue
-                    k, v = kv.split("=", 1)
-                    kwargs[k] = _coerce(v)
-                return spec.fn(**kwargs)
-
-            # single positional string
-            return spec.fn(s)
+        handler = _DISPATCH.get(type(argstr_or_args)) or _subclass_handler(type(argstr_or_args))
+        return handler(spec.fn, argstr_or_args)
+
+
+def _call_from_string(fn: Callable, argstr: str):
+    # Strings: try JSON, then k=v parsing, then single positional
+    s = argstr.strip()
+    if not s:
+        return fn()
+
+    # attempt JSON parsing
+    try:
+        parsed = json.loads(s)
+        if isinstance(parsed, dict):
+            return fn(**parsed)
+        if isinstance(parsed, list):
+            return fn(*parsed)
+    except Exception:
+        pass
+
+    # legacy k=v parsing
+    if "=" in s:
+        kwargs = {}
+        for kv in s.split():
+            if "=" not in kv:
+                continue
+            k, v = kv.split("=", 1)
+            kwargs[k] = _coerce(v)
+        return fn(**kwargs)
+
+    # single positional string
+    return fn(s)
+
+
+def _call_single(fn: Callable, arg: Any):
+    return fn(arg)
+
+
+# argument type -> how to apply it: mappings as kwargs (common with LLM structured
+# args), sequences positionally, strings parsed. One dict lookup per call on the hot path.
+_DISPATCH: Dict[type, Callable[[Callable, Any], Any]] = {
+    dict: lambda fn, a: fn(**a),
+    list: lambda fn, a: fn(*a),
+    tuple: lambda fn, a: fn(*a),
+    str: _call_from_string,
+}
+
+
+@lru_cache(maxsize=None)
+def _subclass_handler(tp: type) -> Callable[[Callable, Any], Any]:
+    # subclasses (OrderedDict, namedtuples, ...) resolve through their MRO once per type
+    for base in tp.__mro__:
+        if base in _DISPATCH:
+            return _DISPATCH[base]
+    return _call_single
 
 
 def _coerce(s: str):
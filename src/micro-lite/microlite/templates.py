@@ -1,5 +1,5 @@
 # microlite/templates.py
-from typing import List
+from typing import Callable, List
 
 PROMPT_TEMPLATE = """You are a helpful agent. Here are available functions:
 {functions}
@@ -9,8 +9,20 @@ User: {user_input}
 If you want to run a function, reply starting with "CALL:<fn_name> <args...>" otherwise reply normally.
 """
 
+def compile_prompt(functions: List[dict]) -> Callable[[str], str]:
+    """
+    Bake the function list into the template once; the returned renderer only
+    concatenates the user input between the prebuilt head and the fixed tail.
+    """
+    head, tail = PROMPT_TEMPLATE.split("{user_input}")
+    prebuilt = head.format(functions="\n".join(
+        f"- {f['name']} {f['signature']}: {f['description']}" for f in functions
+    ))
+
+    def render(user_input: str) -> str:
+        return prebuilt + user_input + tail
+
+    return render
+
 def render_prompt(user_input: str, functions: List[dict]) -> str:
-    func_lines = []
-    for f in functions:
-        func_lines.append(f"- {f['name']} {f['signature']}: {f['description']}")
-    return PROMPT_TEMPLATE.format(functions="\n".join(func_lines), user_input=user_input)
+    return compile_prompt(functions)(user_input)